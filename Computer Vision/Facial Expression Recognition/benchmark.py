@@ -0,0 +1,171 @@
+import argparse
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+import dataset
+
+
+def load_with_pandas(csv_path):
+    """
+    Load the training split the way the notebook originally did: split every row in Python and stack.
+
+    :param csv_path: Path to fer2013.csv.
+    """
+    df = pd.read_csv(csv_path)
+    df['pixels'] = df['pixels'].apply(lambda pixel_sequence: np.array(pixel_sequence.split(' '), dtype=float).reshape(48, 48) / 255.0)
+    train_df = df[df['Usage'] == 'Training']
+    X_train = np.stack(train_df['pixels'].to_numpy())[..., np.newaxis]
+    y_train = train_df['emotion'].to_numpy()
+    return X_train, y_train
+
+
+def build_model():
+    """
+    The CNN from the notebook, so steps/sec reflects the real training workload.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout, BatchNormalization
+
+    model = Sequential([
+        Conv2D(64, (5, 5), activation='elu', input_shape=(48, 48, 1), padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        Conv2D(64, (5, 5), activation='elu', padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        MaxPooling2D(2, 2),
+        Dropout(0.3),
+        Conv2D(128, (3, 3), activation='elu', padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        Conv2D(128, (3, 3), activation='elu', padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        MaxPooling2D(2, 2),
+        Dropout(0.3),
+        Conv2D(256, (3, 3), activation='elu', padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        Conv2D(256, (3, 3), activation='elu', padding='same', kernel_initializer='he_normal'),
+        BatchNormalization(),
+        MaxPooling2D(2, 2),
+        Dropout(0.35),
+        Flatten(),
+        Dense(256, activation='elu'),
+        BatchNormalization(),
+        Dropout(0.35),
+        Dense(7, activation='softmax')
+    ])
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def read_split(csv_path, cache_dir):
+    """
+    Load the training split from the cache and read every pixel into memory.
+
+    :param csv_path: Path to fer2013.csv.
+    :param cache_dir: Directory holding the cache.
+    """
+    images, labels = dataset.load_split('train', csv_path, cache_dir)
+    return np.array(images), labels
+
+
+def benchmark_loading(csv_path):
+    """
+    Compare the notebook loader with the cached loader, cold and warm.
+
+    The cold cache is built in a temporary directory, so no existing cache is touched.
+    Opening the memmap reads no pixels, so the warm cache is timed both for opening
+    and for reading the whole split into memory like the other paths do.
+    """
+    _, pandas_time = time_call(load_with_pandas, csv_path)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, cold_time = time_call(read_split, csv_path, cache_dir)
+        _, open_time = time_call(dataset.load_split, 'train', csv_path, cache_dir)
+        _, read_time = time_call(read_split, csv_path, cache_dir)
+
+    print("Load time (training split)")
+    print(f"  pandas apply + np.stack:      {pandas_time:8.3f} s")
+    print(f"  vectorized, cold cache:       {cold_time:8.3f} s")
+    print(f"  memmap, warm cache, open:     {open_time:8.3f} s")
+    print(f"  memmap, warm cache, read all: {read_time:8.3f} s")
+
+
+def steps_per_second(model, data, steps, warmup_steps):
+    """
+    Train for a number of steps and return the steady state throughput.
+
+    All steps run in a single fit, so they share one data iterator. Graph tracing
+    and filling the shuffle buffer happen during the warm-up steps and are not timed.
+
+    :param model: Compiled model to train.
+    :param data: Training data, must yield at least warmup_steps + steps batches.
+    :param steps: Number of timed steps.
+    :param warmup_steps: Number of steps run before the clock starts.
+    """
+    from tensorflow.keras.callbacks import LambdaCallback
+
+    timings = {}
+
+    def start_clock(batch, logs=None):
+        if batch == warmup_steps:
+            timings['start'] = time.perf_counter()
+
+    def stop_clock(batch, logs=None):
+        timings['end'] = time.perf_counter()
+
+    timer = LambdaCallback(on_train_batch_begin=start_clock, on_train_batch_end=stop_clock)
+    model.fit(data, steps_per_epoch=warmup_steps + steps, epochs=1, verbose=0, callbacks=[timer])
+    return steps / (timings['end'] - timings['start'])
+
+
+def benchmark_training(csv_path, cache_dir, batch_size, steps, warmup_steps):
+    """
+    Compare training throughput of ImageDataGenerator.flow with the tf.data pipeline.
+    """
+    import tensorflow as tf
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+    images, labels = dataset.load_split('train', csv_path, cache_dir)
+
+    data_generator = ImageDataGenerator(
+        rotation_range=10,
+        width_shift_range=0.1,
+        height_shift_range=0.1,
+        shear_range=0.1,
+        zoom_range=0.1,
+        horizontal_flip=True,
+        fill_mode='nearest'
+    )
+    generator_flow = data_generator.flow(images.astype(np.float32) / 255.0, labels, batch_size=batch_size)
+
+    train_ds = dataset.make_dataset(images, labels, batch_size=batch_size, training=True).repeat()
+
+    tf.random.set_seed(0)
+    generator_rate = steps_per_second(build_model(), generator_flow, steps, warmup_steps)
+    tf.random.set_seed(0)
+    pipeline_rate = steps_per_second(build_model(), train_ds, steps, warmup_steps)
+
+    print(f"Training steps/sec (batch size {batch_size}, {steps} steps after {warmup_steps} warm-up steps)")
+    print(f"  ImageDataGenerator.flow: {generator_rate:8.2f}")
+    print(f"  tf.data pipeline:        {pipeline_rate:8.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark FER2013 loading and training input pipelines.")
+    parser.add_argument('--csv', default='fer2013.csv', help="Path to fer2013.csv")
+    parser.add_argument('--cache-dir', default='fer2013_cache', help="Directory for the cached .npy splits")
+    parser.add_argument('--batch-size', type=int, default=128)
+    parser.add_argument('--steps', type=int, default=50, help="Training steps to time per input pipeline")
+    parser.add_argument('--warmup-steps', type=int, default=10, help="Training steps run before timing starts")
+    parser.add_argument('--skip-training', action='store_true', help="Only benchmark loading")
+    args = parser.parse_args()
+
+    benchmark_loading(args.csv)
+    if not args.skip_training:
+        benchmark_training(args.csv, args.cache_dir, args.batch_size, args.steps, args.warmup_steps)
@@ -0,0 +1,207 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Images in FER2013 are 48x48 grayscale, stored as a space-separated pixel string per row.
+IMAGE_SIZE = 48
+NUM_CLASSES = 7
+
+# Map the split names used in training to the 'Usage' values of fer2013.csv
+SPLITS = {
+    'train': 'Training',
+    'val': 'PublicTest',
+    'test': 'PrivateTest'
+}
+
+# Augmentation ranges, matching the ImageDataGenerator used in the notebook
+ROTATION_DEGREES = 10
+SHIFT_FRACTION = 0.1
+SHEAR_DEGREES = 0.1
+ZOOM_FRACTION = 0.1
+
+
+def parse_pixels(pixel_strings, chunk_size=4096):
+    """
+    Parse the space-separated pixel strings of many rows at once.
+
+    Rather than splitting every row in Python, each chunk of rows is joined into
+    one string and handed to numpy's C parser. Every row must hold exactly
+    48 * 48 values in the range 0-255, otherwise a ValueError is raised.
+
+    :param pixel_strings: Series of pixel strings (e.g. df['pixels']).
+    :param chunk_size: Number of rows parsed per call, bounds the memory of the wider parse buffer.
+    :return: uint8 array of shape (N, 48, 48, 1).
+    """
+    pixel_strings = pd.Series(pixel_strings, dtype=str).reset_index(drop=True)
+    values_per_image = IMAGE_SIZE * IMAGE_SIZE
+
+    # A row with too few values followed by one with too many would otherwise shift every later image
+    counts = pixel_strings.str.strip().str.count(' ') + 1
+    bad_rows = np.flatnonzero(counts.to_numpy() != values_per_image)
+    if bad_rows.size:
+        row = bad_rows[0]
+        raise ValueError(f"Row {row} has {counts[row]} pixel values, expected {values_per_image}")
+
+    images = np.empty((len(pixel_strings), IMAGE_SIZE, IMAGE_SIZE, 1), dtype=np.uint8)
+    for start in range(0, len(pixel_strings), chunk_size):
+        chunk = pixel_strings[start:start + chunk_size]
+
+        # Parse into a wider type first, as values above 255 would silently wrap around in uint8
+        pixels = np.fromstring(' '.join(chunk), dtype=np.int32, sep=' ')
+        if pixels.size != len(chunk) * values_per_image:
+            raise ValueError(f"Could not parse the pixel values of rows {start} to {start + len(chunk) - 1}")
+        if pixels.min() < 0 or pixels.max() > 255:
+            raise ValueError(f"Pixel values of rows {start} to {start + len(chunk) - 1} are outside 0-255")
+
+        images[start:start + len(chunk)] = pixels.reshape(-1, IMAGE_SIZE, IMAGE_SIZE, 1)
+
+    return images
+
+
+def cache_paths(cache_dir, split):
+    """
+    Paths of the cached image and label arrays for a split.
+
+    :param cache_dir: Directory holding the cache.
+    :param split: One of 'train', 'val' or 'test'.
+    """
+    images_path = os.path.join(cache_dir, f"fer2013_{split}_images.npy")
+    labels_path = os.path.join(cache_dir, f"fer2013_{split}_labels.npy")
+    return images_path, labels_path
+
+
+def build_cache(csv_path, cache_dir):
+    """
+    Parse fer2013.csv once and write a uint8 .npy file per split.
+
+    :param csv_path: Path to fer2013.csv.
+    :param cache_dir: Directory to write the cache to.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    df = pd.read_csv(csv_path, dtype={'emotion': np.uint8, 'pixels': str, 'Usage': str})
+
+    for split, usage in SPLITS.items():
+        split_df = df[df['Usage'] == usage]
+        images_path, labels_path = cache_paths(cache_dir, split)
+
+        # Write to a temporary file first so an interrupted run never leaves a partial cache
+        np.save(images_path + '.tmp.npy', parse_pixels(split_df['pixels']))
+        np.save(labels_path + '.tmp.npy', split_df['emotion'].to_numpy(dtype=np.uint8))
+        os.replace(images_path + '.tmp.npy', images_path)
+        os.replace(labels_path + '.tmp.npy', labels_path)
+
+
+def is_cached(csv_path, cache_dir):
+    """
+    Check that every split is cached and newer than the csv file.
+
+    If the csv file does not exist, a complete cache is considered valid.
+
+    :param csv_path: Path to fer2013.csv.
+    :param cache_dir: Directory holding the cache.
+    """
+    csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else 0
+    for split in SPLITS:
+        for path in cache_paths(cache_dir, split):
+            if not os.path.exists(path) or os.path.getmtime(path) < csv_mtime:
+                return False
+    return True
+
+
+def load_split(split, csv_path='fer2013.csv', cache_dir='fer2013_cache'):
+    """
+    Load a split of FER2013, building the cache on first use.
+
+    The images are memory-mapped from disk, so once the cache exists opening a
+    split is nearly instant and pixels are only read as they are used. The csv
+    file is not needed when the cache is complete.
+
+    :param split: One of 'train', 'val' or 'test'.
+    :param csv_path: Path to fer2013.csv.
+    :param cache_dir: Directory holding the cache.
+    :return: Tuple of uint8 images (N, 48, 48, 1) and uint8 labels (N,).
+    """
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split '{split}', expected one of {list(SPLITS)}")
+
+    if not is_cached(csv_path, cache_dir):
+        build_cache(csv_path, cache_dir)
+
+    images_path, labels_path = cache_paths(cache_dir, split)
+    images = np.load(images_path, mmap_mode='r')
+    labels = np.load(labels_path)
+    return images, labels
+
+
+def build_augmentation():
+    """
+    Build the augmentation model applied to whole batches inside the tf.data pipeline.
+
+    Shearing uses RandomShear, which ships with Keras 3. On Keras 2 that layer
+    does not exist and shearing is skipped.
+    """
+    from tensorflow.keras import Sequential
+    from tensorflow.keras import layers
+
+    augmentation = [
+        layers.RandomRotation(ROTATION_DEGREES / 360, fill_mode='nearest'),
+        layers.RandomTranslation(SHIFT_FRACTION, SHIFT_FRACTION, fill_mode='nearest'),
+        layers.RandomZoom(ZOOM_FRACTION, fill_mode='nearest'),
+        layers.RandomFlip('horizontal')
+    ]
+
+    # ImageDataGenerator takes the shear as an angle, RandomShear as a fraction of the image size
+    if hasattr(layers, 'RandomShear'):
+        shear_fraction = float(np.tan(np.radians(SHEAR_DEGREES)))
+        augmentation.insert(2, layers.RandomShear(x_factor=shear_fraction, fill_mode='nearest'))
+
+    return Sequential(augmentation)
+
+
+def make_dataset(images, labels, batch_size=128, training=False, cache=False, seed=None):
+    """
+    Build a tf.data pipeline that normalizes, augments and prefetches batches.
+
+    Images are batched before they are normalized and augmented, so every
+    transformation runs once per batch on parallel threads instead of once per image.
+
+    Without training, the normalized batches are cached, so later epochs skip
+    normalization. With training, the cache has to sit before shuffling and
+    augmentation, where it holds the raw images. That only helps with a file path
+    cache for data that does not fit in memory, as the images are already in memory.
+
+    :param images: uint8 images of shape (N, 48, 48, 1), e.g. from load_split.
+    :param labels: Labels of shape (N,).
+    :param batch_size: Number of images per batch.
+    :param training: Shuffle and augment the data when True.
+    :param cache: False to disable caching, True to cache in memory or a file path to cache on disk.
+    :param seed: Optional shuffle seed.
+    """
+    import tensorflow as tf
+
+    cache_path = cache if isinstance(cache, str) else ''
+    dataset = tf.data.Dataset.from_tensor_slices((images, labels))
+
+    if training:
+        # Cache the raw uint8 images, so shuffling and augmentation still differ every epoch
+        if cache:
+            dataset = dataset.cache(cache_path)
+        dataset = dataset.shuffle(len(labels), seed=seed, reshuffle_each_iteration=True)
+
+    dataset = dataset.batch(batch_size)
+
+    def normalize(batch_images, batch_labels):
+        return tf.cast(batch_images, tf.float32) / 255.0, batch_labels
+
+    dataset = dataset.map(normalize, num_parallel_calls=tf.data.AUTOTUNE)
+
+    if training:
+        augmentation = build_augmentation()
+        dataset = dataset.map(
+            lambda batch_images, batch_labels: (augmentation(batch_images, training=True), batch_labels),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+    elif cache:
+        dataset = dataset.cache(cache_path)
+
+    return dataset.prefetch(tf.data.AUTOTUNE)